@@ -3,7 +3,7 @@
  3-PHASE POWER FACTOR MONITOR — Python Flask Application
 ============================================================
  Receives 3-phase sensor data wirelessly from ESP32 via
- HTTP POST, logs to Excel, sends desktop notifications,
+ HTTP POST, logs readings (exportable to Excel), sends desktop notifications,
  and serves a real-time web dashboard.
 
  Usage:
@@ -11,18 +11,36 @@
    python app.py --simulate         # Simulation mode (fake 3-phase data)
    python app.py --port 5000        # Custom port
    python app.py --threshold 0.85   # Custom PF threshold
+   python app.py --production       # Serve with gevent instead of the dev server
+
+ Cloud / Linux:
+   gunicorn wsgi:app -k gevent -w 1 --worker-connections 1000
 ============================================================
 """
 
-import os
 import sys
+
+# --production serves with gevent: patch the stdlib before threading, queue and
+# socket are imported so locks, queue waits and sleeps yield to the hub
+# (gunicorn's gevent worker does the same before importing wsgi.py)
+if __name__ == '__main__' and '--production' in sys.argv[1:]:
+    from gevent import monkey
+    monkey.patch_all()
+
+import os
+import io
 import json
 import time
-import random
 import math
+import atexit
+import logging
 import argparse
+import queue
+import glob
+import tempfile
 import threading
-from datetime import datetime
+from datetime import datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener
 from collections import deque
 
 # Fix Windows console encoding (cp1252 can't render emoji)
@@ -30,8 +48,13 @@ if sys.platform == 'win32':
     sys.stdout.reconfigure(errors='replace')
     sys.stderr.reconfigure(errors='replace')
 
-from flask import Flask, request, jsonify, render_template
-from openpyxl import Workbook, load_workbook
+import numpy as np
+import orjson
+import zstandard
+from flask import Flask, request, jsonify, render_template, send_file
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.serving import WSGIRequestHandler
+import xlsxwriter
 
 # ── Try to import plyer for notifications ────────────────────
 try:
@@ -42,162 +65,548 @@ except ImportError:
     print("⚠  plyer not installed — desktop notifications disabled.")
     print("   Install with: pip install plyer")
 
+# ── Optional: numba JIT-compiles the simulator physics ───────
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        return lambda fn: fn
+
 # ════════════════════════════════════════════════════════════
 #  CONFIGURATION
 # ════════════════════════════════════════════════════════════
 DEFAULT_PORT = 5000
 DEFAULT_THRESHOLD = 0.85
-EXCEL_FILE = "power_factor_log.xlsx"
+LOG_PREFIX = "power_factor_log"      # One <prefix>_<start time>.jsonl.zst segment per run
+EXCEL_FILE = "power_factor_log.xlsx"   # Download name for /api/export
+EXCEL_SHEET_NAME = "3-Phase Power Factor Log"
+EXCEL_MAX_ROWS = 1048576     # xlsx rows per worksheet, header included
+LOG_FLUSH_ROWS = 30          # Write buffered readings once this many are pending...
+LOG_FLUSH_INTERVAL = 30      # ...or at least this often (seconds)
+LOG_READ_CHUNK = 1 << 16
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"  # Start of every zstd frame
+QUEUE_SIZE = 1000            # Readings waiting for a background worker
 MAX_READINGS = 500
 NOTIFICATION_COOLDOWN = 30
 PHASE_NAMES = ['R', 'Y', 'B']
 PHASE_KEYS = ['phase_r', 'phase_y', 'phase_b']
+PHASE_FIELDS = ['voltage', 'current', 'power_factor', 'real_power', 'apparent_power', 'reactive_power']
+TOTAL_FIELDS = ['overall_pf', 'total_real_power', 'total_apparent_power', 'total_reactive_power']
+PHASE_ROUNDS = (2, 3, 3, 2, 2, 2)   # Decimal places logged for each PHASE_FIELDS entry
+TOTAL_ROUNDS = (3, 2, 2, 2)         # ...and for each TOTAL_FIELDS entry
+
+# ════════════════════════════════════════════════════════════
+#  READINGS BUFFER — 3-Phase
+# ════════════════════════════════════════════════════════════
+# Each reading is one row: 6 fields per phase (R, Y, B), then the totals
+NUM_COLUMNS = len(PHASE_KEYS) * len(PHASE_FIELDS) + len(TOTAL_FIELDS)
+V_COLS = [i * len(PHASE_FIELDS) + PHASE_FIELDS.index('voltage') for i in range(len(PHASE_KEYS))]
+I_COLS = [i * len(PHASE_FIELDS) + PHASE_FIELDS.index('current') for i in range(len(PHASE_KEYS))]
+PF_COLS = [i * len(PHASE_FIELDS) + PHASE_FIELDS.index('power_factor') for i in range(len(PHASE_KEYS))]
+OVERALL_PF_COL = len(PHASE_KEYS) * len(PHASE_FIELDS) + TOTAL_FIELDS.index('overall_pf')
+EXCEL_PF_COLS = tuple(col + 1 for col in PF_COLS)  # Sheet column 0 is the timestamp
+
+
+class ReadingBuffer:
+    """Fixed-capacity ring buffer of readings stored as rows of a NumPy array.
+
+    Readings are kept as flat float rows instead of nested dicts; dicts are
+    only rebuilt for the rows an API response actually returns.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.values = np.zeros((capacity, NUM_COLUMNS), dtype=np.float64)
+        self.timestamps = [None] * capacity
+        self.head = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, data):
+        """Store a reading; returns (row, evicted row or None) as float lists."""
+        row = []
+        for key in PHASE_KEYS:
+            phase = data[key]
+            row += [phase.get(field, 0) for field in PHASE_FIELDS]
+        row += [data[field] for field in TOTAL_FIELDS]
+
+        evicted = self.values[self.head].tolist() if self.size == self.capacity else None
+        self.values[self.head] = row
+        self.timestamps[self.head] = data['timestamp']
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return self.values[self.head - 1].tolist(), evicted
+
+    def _to_dict(self, values, timestamp):
+        reading = {"timestamp": timestamp}
+        width = len(PHASE_FIELDS)
+        for i, key in enumerate(PHASE_KEYS):
+            reading[key] = dict(zip(PHASE_FIELDS, values[i * width:(i + 1) * width]))
+        reading.update(zip(TOTAL_FIELDS, values[len(PHASE_KEYS) * width:]))
+        return reading
+
+    def latest(self):
+        idx = (self.head - 1) % self.capacity
+        return self._to_dict(self.values[idx].tolist(), self.timestamps[idx])
+
+    def recent(self, count):
+        """Return the last `count` readings (oldest first) as dicts."""
+        # Same semantics as list[-count:], but only the selected rows are copied
+        start, stop, _ = slice(-count, None).indices(self.size)
+        idx = ((self.head - self.size + np.arange(start, stop)) % self.capacity).tolist()
+        return [self._to_dict(v, self.timestamps[i]) for v, i in zip(self.values[idx].tolist(), idx)]
+
+
+# ════════════════════════════════════════════════════════════
+#  RUNNING STATISTICS — 3-Phase
+# ════════════════════════════════════════════════════════════
+class Stats:
+    """Running aggregates over the readings window.
+
+    Sums and counts are updated as readings enter and leave the window, and
+    min/max come from monotonic queues, so a query never rescans readings.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.count = 0
+        n = len(PHASE_KEYS)
+        self.sum_pf = [0.0] * n
+        self.pf_count = [0] * n
+        self.low_pf_count = [0] * n
+        self.sum_v = [0.0] * n
+        self.sum_i = [0.0] * n
+        self.sum_overall = 0.0
+        self.overall_count = 0
+        # One (seq, pf) queue per phase plus one for overall PF
+        self.min_q = [deque() for _ in range(n + 1)]
+        self.max_q = [deque() for _ in range(n + 1)]
+
+    def _update(self, row, sign):
+        for i in range(len(PHASE_KEYS)):
+            pf = row[PF_COLS[i]]
+            self.sum_v[i] += sign * row[V_COLS[i]]
+            self.sum_i[i] += sign * row[I_COLS[i]]
+            if pf > 0:
+                self.sum_pf[i] += sign * pf
+                self.pf_count[i] += sign
+                if pf < pf_threshold:
+                    self.low_pf_count[i] += sign
+        opf = row[OVERALL_PF_COL]
+        if opf > 0:
+            self.sum_overall += sign * opf
+            self.overall_count += sign
+
+    def _push_extremes(self, idx, value):
+        lo, hi = self.min_q[idx], self.max_q[idx]
+        while lo and lo[-1][1] >= value:
+            lo.pop()
+        lo.append((self.seq, value))
+        while hi and hi[-1][1] <= value:
+            hi.pop()
+        hi.append((self.seq, value))
+
+    def add(self, row, evicted=None):
+        """Account for a new buffer row and, if the window was full, the one it pushed out."""
+        with self.lock:
+            if evicted is not None:
+                self._update(evicted, -1)
+                self.count -= 1
+            self._update(row, 1)
+            self.count += 1
+
+            self.seq += 1
+            oldest = self.seq - self.window
+            for i, col in enumerate(PF_COLS + [OVERALL_PF_COL]):
+                if row[col] > 0:
+                    self._push_extremes(i, row[col])
+            for q in self.min_q + self.max_q:
+                while q and q[0][0] <= oldest:
+                    q.popleft()
+
+    def _extremes(self, idx):
+        lo, hi = self.min_q[idx], self.max_q[idx]
+        return (round(lo[0][1], 3) if lo else 0, round(hi[0][1], 3) if hi else 0)
+
+    def to_dict(self):
+        with self.lock:
+            result = {"count": self.count, "threshold": pf_threshold, "phases": {}}
+
+            for i in range(len(PHASE_KEYS)):
+                min_pf, max_pf = self._extremes(i)
+                n_pf = self.pf_count[i]
+                result["phases"][PHASE_NAMES[i]] = {
+                    "avg_pf": round(self.sum_pf[i] / n_pf, 3) if n_pf else 0,
+                    "min_pf": min_pf,
+                    "max_pf": max_pf,
+                    "avg_voltage": round(self.sum_v[i] / self.count, 1) if self.count else 0,
+                    "avg_current": round(self.sum_i[i] / self.count, 3) if self.count else 0,
+                    "low_pf_count": self.low_pf_count[i],
+                }
+
+            min_pf, max_pf = self._extremes(len(PHASE_KEYS))
+            n_pf = self.overall_count
+            result["overall"] = {
+                "avg_pf": round(self.sum_overall / n_pf, 3) if n_pf else 0,
+                "min_pf": min_pf,
+                "max_pf": max_pf,
+            }
+            return result
+
 
 # ════════════════════════════════════════════════════════════
 #  FLASK APP
 # ════════════════════════════════════════════════════════════
+class OrJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, so jsonify() and
+    request.get_json() take the fast path too."""
+
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_SORT_KEYS if kwargs.get('sort_keys', self.sort_keys) else 0
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = OrJSONProvider(app)
 
-readings = deque(maxlen=MAX_READINGS)
+readings = ReadingBuffer(MAX_READINGS)
+stats = Stats(MAX_READINGS)
+readings_lock = threading.Lock()
 last_notification_time = 0
 pf_threshold = DEFAULT_THRESHOLD
 
-excel_lock = threading.Lock()
+# Bounded queues feed one long-lived consumer thread each; the log worker is
+# the only writer, so the log needs no lock.
+log_queue = queue.Queue(maxsize=QUEUE_SIZE)
+notify_queue = queue.Queue(maxsize=QUEUE_SIZE)
+notify_thread = None
+log_thread = None
+log_writer = None
+log_path = None
+
+# Last exported workbook, keyed on ?days and the log segment sizes it was built from
+export_lock = threading.Lock()
+export_cache = (None, b"")
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Enqueue records untouched so %-formatting runs on the listener thread."""
+
+    def prepare(self, record):
+        return record
+
+
+# Request-path console output only enqueues a record; the listener thread
+# formats it and does the (slow on Windows) console write. The logger is
+# process-wide, so a second import of this file must not add another handler.
+logger = logging.getLogger('pf_monitor')
+if not logger.handlers:
+    console_queue = queue.Queue(-1)
+    console_listener = QueueListener(console_queue, logging.StreamHandler(sys.stdout))
+    console_listener.start()
+    atexit.register(console_listener.stop)
+
+    logger.setLevel(logging.INFO)
+    logger.addHandler(_DeferredQueueHandler(console_queue))
+    logger.propagate = False
+
+READING_LOG_FMT = "📡 [%s] Overall PF=%.3f %s" + "".join(
+    f"\n   Phase {name}: V=%.1fV I=%.3fA PF=%.3f P=%.1fW" for name in PHASE_NAMES)
 
 
 # ════════════════════════════════════════════════════════════
-#  EXCEL LOGGER — 3-Phase
+#  READING LOG — zstd-compressed JSON lines
 # ════════════════════════════════════════════════════════════
-def init_excel():
-    """Create Excel file with 3-phase headers."""
-    if not os.path.exists(EXCEL_FILE):
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "3-Phase Power Factor Log"
-
-        headers = ["Timestamp"]
-        for phase in PHASE_NAMES:
-            headers += [
-                f"V_{phase} (V)",
-                f"I_{phase} (A)",
-                f"PF_{phase}",
-                f"P_{phase} (W)",
-                f"S_{phase} (VA)",
-                f"Q_{phase} (VAR)",
-            ]
-        headers += [
-            "Overall PF",
-            "Total P (W)",
-            "Total S (VA)",
-            "Total Q (VAR)",
-            "Status"
-        ]
-        ws.append(headers)
-
-        # Style headers
-        from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-        header_font = Font(name='Calibri', bold=True, color='FFFFFF', size=10)
-        thin_border = Border(
-            left=Side(style='thin'), right=Side(style='thin'),
-            top=Side(style='thin'), bottom=Side(style='thin')
-        )
+def init_log():
+    """Start a new compressed log segment and its writer thread.
 
-        # Phase colors: R=Red, Y=Yellow, B=Blue
-        phase_colors = ['D32F2F', 'F9A825', '1565C0']
-        general_color = '2E7D32'
-
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_num)
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal='center', wrap_text=True)
-            cell.border = thin_border
-
-            # Choose header color by phase
-            if col_num == 1:
-                color = '37474F'
-            elif col_num <= 7:
-                color = phase_colors[0]
-            elif col_num <= 13:
-                color = phase_colors[1]
-            elif col_num <= 19:
-                color = phase_colors[2]
-            else:
-                color = general_color
-            cell.fill = PatternFill(start_color=color, end_color=color, fill_type='solid')
+    Every run writes its own segment, so a frame left half-written by a
+    killed process is never followed by new data in the same file.
+    """
+    global log_writer, log_thread, log_path
+
+    if log_writer is not None:
+        return
+
+    log_path = f"{LOG_PREFIX}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.jsonl.zst"
+    log_writer = zstandard.ZstdCompressor(level=3).stream_writer(open(log_path, 'xb'))
+    log_thread = threading.Thread(target=log_worker, name='log', daemon=True)
+    log_thread.start()
+    atexit.register(close_log)
+    print(f"🗃  Logging readings to: {log_path}")
 
-        # Column widths
-        for i in range(1, len(headers) + 1):
-            ws.column_dimensions[ws.cell(row=1, column=i).column_letter].width = 13
-        ws.column_dimensions['A'].width = 20
 
-        wb.save(EXCEL_FILE)
-        print(f"📊 Created Excel file: {EXCEL_FILE}")
+def close_log():
+    """Write any pending readings and close the log."""
+    global log_writer
 
+    if log_writer is None:
+        return
+    # Sentinel tells the worker to write what it has and stop
+    log_queue.put(None)
+    log_thread.join()
+    try:
+        log_writer.close()
+    except Exception as e:
+        print(f"❌ Log close error: {e}")
+    log_writer = None
 
-def log_to_excel(data):
-    """Append a 3-phase reading to Excel."""
-    with excel_lock:
+
+def log_reading(data):
+    """Hand a 3-phase reading to the log worker without blocking."""
+    try:
+        log_queue.put_nowait(data)
+    except queue.Full:
+        logger.warning("⚠  Log queue full — reading not logged")
+
+
+def log_worker():
+    """Consume queued readings, appending them in batches of LOG_FLUSH_ROWS
+    or every LOG_FLUSH_INTERVAL seconds, whichever comes first.
+
+    Each batch is closed as its own zstd frame, so the file stays readable
+    up to the last flush even if the server is killed. A queued Event forces
+    an early flush and is set once the batch is on disk.
+    """
+    batch = []
+    deadline = time.monotonic() + LOG_FLUSH_INTERVAL
+    stop = False
+    while not stop:
+        flushed = None
         try:
-            wb = load_workbook(EXCEL_FILE)
-            ws = wb.active
-
-            from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-            thin_border = Border(
-                left=Side(style='thin'), right=Side(style='thin'),
-                top=Side(style='thin'), bottom=Side(style='thin')
-            )
-
-            overall_pf = data.get('overall_pf', 0)
-            status = "✅ Good" if overall_pf >= pf_threshold else "⚠️ Low PF"
-
-            row = [data['timestamp']]
-            for key in PHASE_KEYS:
-                phase = data.get(key, {})
-                row += [
-                    round(phase.get('voltage', 0), 2),
-                    round(phase.get('current', 0), 3),
-                    round(phase.get('power_factor', 0), 3),
-                    round(phase.get('real_power', 0), 2),
-                    round(phase.get('apparent_power', 0), 2),
-                    round(phase.get('reactive_power', 0), 2),
-                ]
-            row += [
-                round(overall_pf, 3),
-                round(data.get('total_real_power', 0), 2),
-                round(data.get('total_apparent_power', 0), 2),
-                round(data.get('total_reactive_power', 0), 2),
-                status
-            ]
-
-            ws.append(row)
-
-            last_row = ws.max_row
-            num_cols = len(row)
-            for col in range(1, num_cols + 1):
-                cell = ws.cell(row=last_row, column=col)
-                cell.alignment = Alignment(horizontal='center')
-                cell.border = thin_border
-
-            # Color status cell
-            status_cell = ws.cell(row=last_row, column=num_cols)
-            if overall_pf < pf_threshold:
-                status_cell.fill = PatternFill(start_color='FFD5D5', end_color='FFD5D5', fill_type='solid')
-                status_cell.font = Font(color='CC0000', bold=True)
+            item = log_queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            if item is None:
+                stop = True
+            elif isinstance(item, threading.Event):
+                flushed = item
             else:
-                status_cell.fill = PatternFill(start_color='D5FFD5', end_color='D5FFD5', fill_type='solid')
-                status_cell.font = Font(color='006600', bold=True)
-
-            # Also highlight individual low-PF phase cells
-            for i, key in enumerate(PHASE_KEYS):
-                pf_col = 2 + i * 6 + 2  # PF column for each phase
-                phase_pf = data.get(key, {}).get('power_factor', 0)
-                pf_cell = ws.cell(row=last_row, column=pf_col)
-                if phase_pf > 0.01 and phase_pf < pf_threshold:
-                    pf_cell.font = Font(color='CC0000', bold=True)
-
-            wb.save(EXCEL_FILE)
-        except Exception as e:
-            print(f"❌ Excel write error: {e}")
+                batch.append(item)
+        except queue.Empty:
+            pass
+
+        if stop or flushed or len(batch) >= LOG_FLUSH_ROWS or time.monotonic() >= deadline:
+            if batch:
+                try:
+                    for data in batch:
+                        log_writer.write(orjson.dumps(data) + b"\n")
+                    log_writer.flush(zstandard.FLUSH_FRAME)
+                except Exception as e:
+                    print(f"❌ Log write error: {e}")
+            batch = []
+            deadline = time.monotonic() + LOG_FLUSH_INTERVAL
+            if flushed:
+                flushed.set()
+
+
+def log_segments():
+    """Paths of all log segments, oldest first."""
+    return sorted(glob.glob(f"{LOG_PREFIX}*.jsonl.zst"))
+
+
+def _find_frame_start(fh, pos):
+    """Offset of the next zstd frame magic number at or after `pos`, or None."""
+    fh.seek(pos)
+    tail = b""
+    while True:
+        chunk = fh.read(LOG_READ_CHUNK)
+        if not chunk:
+            return None
+        buf = tail + chunk
+        idx = buf.find(ZSTD_MAGIC)
+        if idx >= 0:
+            return pos - len(tail) + idx
+        tail = buf[-(len(ZSTD_MAGIC) - 1):]
+        pos += len(chunk)
+
+
+def _iter_log_frames(fh):
+    """Yield the decompressed bytes of each zstd frame in a segment.
+
+    Frames are decoded one at a time. A damaged frame yields whatever decoded
+    before the damage, then reading resumes at the next frame header; a
+    partial last frame (killed mid-flush, or a flush in progress) yields its
+    decoded prefix and ends the segment.
+    """
+    dctx = zstandard.ZstdDecompressor()
+    start = 0
+    while True:
+        fh.seek(start)
+        dobj = dctx.decompressobj()
+        parts = []
+        fed = 0
+        try:
+            while not dobj.eof:
+                chunk = fh.read(LOG_READ_CHUNK)
+                if not chunk:
+                    if parts:
+                        yield b"".join(parts)
+                    return
+                fed += len(chunk)
+                parts.append(dobj.decompress(chunk))
+        except zstandard.ZstdError as e:
+            print(f"⚠  Skipping damaged log data at byte {start} of {fh.name}: {e}")
+            if parts:
+                yield b"".join(parts)
+            start = _find_frame_start(fh, start + 1)
+            if start is None:
+                return
+            continue
+        yield b"".join(parts)
+        start += fed - len(dobj.unused_data)
+
+
+def iter_logged_readings(since=None):
+    """Yield every reading in the log segments, oldest first; with a `since`
+    datetime, only readings logged at or after it."""
+    cutoff = since.strftime("%Y-%m-%d %H:%M:%S") if since else None
+    for path in log_segments():
+        if since and os.path.getmtime(path) < since.timestamp():
+            continue  # Segment was last written before the window
+        with open(path, 'rb') as fh:
+            for payload in _iter_log_frames(fh):
+                for line in payload.split(b"\n"):
+                    if not line.strip():
+                        continue
+                    try:
+                        data = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        continue  # Cut-off line at the end of a damaged or partial frame
+                    if cutoff is None or data.get('timestamp', '') >= cutoff:
+                        yield data
+
+
+# ════════════════════════════════════════════════════════════
+#  EXCEL EXPORT — 3-Phase
+# ════════════════════════════════════════════════════════════
+def build_excel(path, since=None):
+    """Write the logged readings (all, or those since `since`) to a styled
+    Excel workbook at `path`, continuing on a new worksheet when one is full."""
+    wb = xlsxwriter.Workbook(path, {'constant_memory': True})
+    ws = wb.add_worksheet(EXCEL_SHEET_NAME)
+    formats = write_excel_header(wb, ws)
+    sheets = 1
+    row_idx = 1
+    for data in iter_logged_readings(since):
+        if row_idx == EXCEL_MAX_ROWS:
+            sheets += 1
+            ws = wb.add_worksheet(f"{EXCEL_SHEET_NAME} ({sheets})")
+            formats = write_excel_header(wb, ws)
+            row_idx = 1
+        if write_excel_row(ws, row_idx, data, formats):
+            row_idx += 1
+    wb.close()
+
+
+def render_excel(since=None):
+    """Build the export workbook in a temp file and return its bytes."""
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    try:
+        build_excel(path, since)
+        with open(path, 'rb') as fh:
+            return fh.read()
+    finally:
+        os.remove(path)
+
+
+def run_off_hub(fn, *args):
+    """Call `fn`, in gevent's native thread pool when the server is
+    monkey-patched, so a long build doesn't stall the event loop."""
+    if 'gevent' in sys.modules:
+        from gevent import monkey, get_hub
+        if monkey.is_module_patched('threading'):
+            return get_hub().threadpool.apply(fn, args)
+    return fn(*args)
+
+
+def write_excel_header(wb, ws):
+    """Write the 3-phase header row; returns the row formats to reuse."""
+    headers = ["Timestamp"]
+    for phase in PHASE_NAMES:
+        headers += [
+            f"V_{phase} (V)",
+            f"I_{phase} (A)",
+            f"PF_{phase}",
+            f"P_{phase} (W)",
+            f"S_{phase} (VA)",
+            f"Q_{phase} (VAR)",
+        ]
+    headers += [
+        "Overall PF",
+        "Total P (W)",
+        "Total S (VA)",
+        "Total Q (VAR)",
+        "Status"
+    ]
+
+    # One format per header group, shared by every column in it
+    header_style = {'font_name': 'Calibri', 'bold': True, 'font_color': '#FFFFFF', 'font_size': 10,
+                    'align': 'center', 'text_wrap': True, 'border': 1}
+    timestamp_fmt = wb.add_format({**header_style, 'bg_color': '#37474F'})
+    # Phase colors: R=Red, Y=Yellow, B=Blue
+    phase_fmts = [wb.add_format({**header_style, 'bg_color': color})
+                  for color in ('#D32F2F', '#F9A825', '#1565C0')]
+    general_fmt = wb.add_format({**header_style, 'bg_color': '#2E7D32'})
+
+    width = len(PHASE_FIELDS)
+    ws.write(0, 0, headers[0], timestamp_fmt)
+    for i, fmt in enumerate(phase_fmts):
+        ws.write_row(0, 1 + i * width, headers[1 + i * width:1 + (i + 1) * width], fmt)
+    ws.write_row(0, 1 + len(phase_fmts) * width, headers[1 + len(phase_fmts) * width:], general_fmt)
+
+    # Column widths
+    ws.set_column(1, len(headers) - 1, 13)
+    ws.set_column(0, 0, 20)
+
+    # Row formats are built once and reused for every reading
+    return {
+        'cell': wb.add_format({'align': 'center', 'border': 1}),
+        'low_pf': wb.add_format(
+            {'align': 'center', 'border': 1, 'font_color': '#CC0000', 'bold': True}),
+        'status_good': wb.add_format(
+            {'align': 'center', 'border': 1, 'bg_color': '#D5FFD5', 'font_color': '#006600', 'bold': True}),
+        'status_low': wb.add_format(
+            {'align': 'center', 'border': 1, 'bg_color': '#FFD5D5', 'font_color': '#CC0000', 'bold': True}),
+    }
+
+
+def write_excel_row(ws, row_idx, data, formats):
+    """Write a 3-phase reading as sheet row `row_idx`; returns False if it was skipped."""
+    try:
+        overall_pf = data['overall_pf']
+        status = "✅ Good" if overall_pf >= pf_threshold else "⚠️ Low PF"
+
+        row = [data['timestamp']]
+        for key in PHASE_KEYS:
+            get = data[key].get
+            row += [round(get(field, 0), digits) for field, digits in zip(PHASE_FIELDS, PHASE_ROUNDS)]
+        row += [round(data[field], digits) for field, digits in zip(TOTAL_FIELDS, TOTAL_ROUNDS)]
+
+        if ws.write_row(row_idx, 0, row, formats['cell']):
+            raise ValueError(f"row {row_idx} is outside the worksheet")
+
+        # Color status cell
+        status_fmt = formats['status_low' if overall_pf < pf_threshold else 'status_good']
+        ws.write(row_idx, len(row), status, status_fmt)
+
+        # Also highlight individual low-PF phase cells
+        for key, pf_col in zip(PHASE_KEYS, EXCEL_PF_COLS):
+            phase_pf = data[key].get('power_factor', 0)
+            if phase_pf > 0.01 and phase_pf < pf_threshold:
+                ws.write(row_idx, pf_col, row[pf_col], formats['low_pf'])
+        return True
+    except Exception as e:
+        print(f"❌ Excel write error: {e}")
+        return False
 
 
 # ════════════════════════════════════════════════════════════
@@ -210,23 +619,20 @@ def send_notification(data):
     if not NOTIFICATIONS_AVAILABLE:
         return
 
-    # Check which phases have low PF
-    low_phases = []
-    for i, key in enumerate(PHASE_KEYS):
-        pf = data.get(key, {}).get('power_factor', 1.0)
-        if 0.01 < pf < pf_threshold:
-            low_phases.append(f"Phase {PHASE_NAMES[i]}: {pf:.3f}")
-
-    overall_pf = data.get('overall_pf', 1.0)
-    if overall_pf >= pf_threshold and not low_phases:
-        return
-
+    # Cheapest checks first — most readings are either in cooldown or fine
     now = time.time()
     if now - last_notification_time < NOTIFICATION_COOLDOWN:
         return
+
+    phase_pfs = [data.get(key, {}).get('power_factor', 1.0) for key in PHASE_KEYS]
+    overall_pf = data.get('overall_pf', 1.0)
+    if overall_pf >= pf_threshold and not any(0.01 < pf < pf_threshold for pf in phase_pfs):
+        return
     last_notification_time = now
 
     try:
+        low_phases = [f"Phase {name}: {pf:.3f}" for name, pf in zip(PHASE_NAMES, phase_pfs)
+                      if 0.01 < pf < pf_threshold]
         msg = f"Overall PF: {overall_pf:.3f} (Threshold: {pf_threshold})\n"
         if low_phases:
             msg += "Low phases:\n" + "\n".join(low_phases)
@@ -242,6 +648,22 @@ def send_notification(data):
         print(f"⚠  Notification error: {e}")
 
 
+def init_notifications():
+    """Start the notification worker (only if plyer is available)."""
+    global notify_thread
+
+    if not NOTIFICATIONS_AVAILABLE or notify_thread is not None:
+        return
+    notify_thread = threading.Thread(target=notify_worker, name='notify', daemon=True)
+    notify_thread.start()
+
+
+def notify_worker():
+    """Consume queued readings and raise notifications one at a time."""
+    while True:
+        send_notification(notify_queue.get())
+
+
 # ════════════════════════════════════════════════════════════
 #  FLASK ROUTES
 # ════════════════════════════════════════════════════════════
@@ -271,40 +693,77 @@ def receive_data():
             if field not in data:
                 data[field] = 0.0
 
-        readings.append(data)
+        with readings_lock:
+            row, evicted = readings.append(data)
+            stats.add(row, evicted)
 
         # Console output
         opf = data['overall_pf']
-        status = "✅" if opf >= pf_threshold else "⚠️ LOW"
-        print(f"📡 [{data['timestamp']}] Overall PF={opf:.3f} {status}")
-        for i, key in enumerate(PHASE_KEYS):
+        args = [data['timestamp'], opf, "✅" if opf >= pf_threshold else "⚠️ LOW"]
+        for key in PHASE_KEYS:
             p = data[key]
-            print(f"   Phase {PHASE_NAMES[i]}: V={p['voltage']:.1f}V "
-                  f"I={p['current']:.3f}A PF={p['power_factor']:.3f} "
-                  f"P={p['real_power']:.1f}W")
+            args += [p['voltage'], p['current'], p['power_factor'], p['real_power']]
+        logger.info(READING_LOG_FMT, *args)
 
-        # Background tasks
-        threading.Thread(target=log_to_excel, args=(data.copy(),), daemon=True).start()
-        threading.Thread(target=send_notification, args=(data.copy(),), daemon=True).start()
+        # Background work — both only read the reading, so they share it
+        log_reading(data)
+        if notify_thread is not None:
+            try:
+                notify_queue.put_nowait(data)
+            except queue.Full:
+                pass  # Alerts are rate-limited anyway; skipping one under load is harmless
 
         return jsonify({"status": "ok"}), 200
 
     except Exception as e:
-        print(f"❌ Error: {e}")
+        logger.error("❌ Error: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/api/export')
+def export_excel():
+    """Send the reading log (or its last `?days=N`) as an Excel workbook,
+    rebuilding it only when the log has grown since the last export."""
+    global export_cache
+
+    days = request.args.get('days', type=int)
+    if days is not None and days <= 0:
+        return jsonify({"error": "days must be a positive integer"}), 400
+    since = datetime.now() - timedelta(days=days) if days else None
+
+    # Get readings still waiting in the current batch onto disk first
+    if log_writer is not None:
+        flushed = threading.Event()
+        try:
+            log_queue.put(flushed, timeout=5)
+            flushed.wait(timeout=5)
+        except queue.Full:
+            pass
+
+    with export_lock:
+        key = (days, tuple((p, os.path.getsize(p)) for p in log_segments()))
+        if key != export_cache[0]:
+            export_cache = (key, run_off_hub(render_excel, since))
+        body = export_cache[1]
+    return send_file(io.BytesIO(body), as_attachment=True, download_name=EXCEL_FILE,
+                     mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+
+
 @app.route('/api/readings')
 def get_readings():
     count = request.args.get('count', 50, type=int)
-    recent = list(readings)[-count:]
-    return jsonify({"readings": recent, "threshold": pf_threshold, "total_count": len(readings)})
+    with readings_lock:
+        recent = readings.recent(count)
+        total = len(readings)
+    return jsonify({"readings": recent, "threshold": pf_threshold, "total_count": total})
 
 
 @app.route('/api/latest')
 def get_latest():
-    if readings:
-        return jsonify({"reading": readings[-1], "threshold": pf_threshold})
+    with readings_lock:
+        latest = readings.latest() if readings else None
+    if latest:
+        return jsonify({"reading": latest, "threshold": pf_threshold})
     return jsonify({"reading": None, "threshold": pf_threshold})
 
 
@@ -313,75 +772,77 @@ def get_stats():
     if not readings:
         return jsonify({"error": "No data yet"})
 
-    recent = list(readings)
-    result = {"count": len(recent), "threshold": pf_threshold, "phases": {}}
-
-    for i, key in enumerate(PHASE_KEYS):
-        pfs = [r[key]['power_factor'] for r in recent if r.get(key, {}).get('power_factor', 0) > 0]
-        voltages = [r[key]['voltage'] for r in recent if key in r]
-        currents = [r[key]['current'] for r in recent if key in r]
-
-        result["phases"][PHASE_NAMES[i]] = {
-            "avg_pf": round(sum(pfs) / len(pfs), 3) if pfs else 0,
-            "min_pf": round(min(pfs), 3) if pfs else 0,
-            "max_pf": round(max(pfs), 3) if pfs else 0,
-            "avg_voltage": round(sum(voltages) / len(voltages), 1) if voltages else 0,
-            "avg_current": round(sum(currents) / len(currents), 3) if currents else 0,
-            "low_pf_count": sum(1 for p in pfs if p < pf_threshold),
-        }
-
-    overall_pfs = [r.get('overall_pf', 0) for r in recent if r.get('overall_pf', 0) > 0]
-    result["overall"] = {
-        "avg_pf": round(sum(overall_pfs) / len(overall_pfs), 3) if overall_pfs else 0,
-        "min_pf": round(min(overall_pfs), 3) if overall_pfs else 0,
-        "max_pf": round(max(overall_pfs), 3) if overall_pfs else 0,
-    }
-
-    return jsonify(result)
+    return jsonify(stats.to_dict())
 
 
 # ════════════════════════════════════════════════════════════
 #  SIMULATION MODE — 3-Phase
 # ════════════════════════════════════════════════════════════
+sim_rng = np.random.default_rng()
+
+
+@njit()
+def _compute_phases(t, noise):
+    """Simulated phase values for tick `t` as an (n_phases, 6) array in
+    PHASE_FIELDS order. `noise` rows are: PF dip, PF jitter, V jitter, I jitter."""
+    idx = np.arange(noise.shape[1]).astype(np.float64)
+    # Each phase has slightly different characteristics
+    base_pf = 0.90 + 0.05 * np.sin(t * 0.1 + idx * 2.094) - noise[0]
+    pf = np.minimum(1.0, np.maximum(0.3, base_pf + noise[1]))
+
+    voltage = 220 + noise[2] + idx * 2  # Slight phase offset
+    current = 2.0 + noise[3] + idx * 0.5
+    apparent = voltage * current
+    real = apparent * pf
+    reactive = np.sqrt(np.maximum(0.0, apparent**2 - real**2))
+
+    out = np.empty((noise.shape[1], 6))
+    out[:, 0] = voltage
+    out[:, 1] = current
+    out[:, 2] = pf
+    out[:, 3] = real
+    out[:, 4] = apparent
+    out[:, 5] = reactive
+    return out
+
+
 def simulate_data():
     """Generate fake 3-phase sensor data."""
     import requests as req
 
+    # One keep-alive connection for every tick instead of a new one per POST
+    session = req.Session()
+
     print("🔄 Simulation mode: generating fake 3-phase data...")
-    print(f"   Sending to: http://127.0.0.1:{DEFAULT_PORT}/api/data")
+    url = f"http://127.0.0.1:{DEFAULT_PORT}/api/data"
+    print(f"   Sending to: {url}")
     print("   Press Ctrl+C to stop.\n")
+    n = len(PHASE_KEYS)
+    _compute_phases(0.0, np.zeros((4, n)))  # Warm up the JIT before the first tick
     time.sleep(2)
 
     t = 0
     while True:
         try:
-            phases = {}
-            total_real = 0
-            total_apparent = 0
-
-            for i, key in enumerate(PHASE_KEYS):
-                # Each phase has slightly different characteristics
-                base_pf = 0.90 + 0.05 * math.sin(t * 0.1 + i * 2.094)
-                if random.random() < 0.12:
-                    base_pf -= random.uniform(0.1, 0.3)
-                pf = max(0.3, min(1.0, base_pf + random.gauss(0, 0.02)))
-
-                voltage = 220 + random.gauss(0, 4) + i * 2  # Slight phase offset
-                current = 2.0 + random.gauss(0, 0.3) + i * 0.5
-                apparent = voltage * current
-                real = apparent * pf
-                reactive = math.sqrt(max(0, apparent**2 - real**2))
+            noise = np.empty((4, n))
+            noise[0] = np.where(sim_rng.random(n) < 0.12, sim_rng.uniform(0.1, 0.3, n), 0.0)
+            noise[1] = sim_rng.normal(0, 0.02, n)
+            noise[2] = sim_rng.normal(0, 4, n)
+            noise[3] = sim_rng.normal(0, 0.3, n)
+            values = _compute_phases(float(t), noise)
 
+            phases = {}
+            for key, (v, c, p, r, s, q) in zip(PHASE_KEYS, values.tolist()):
                 phases[key] = {
-                    "voltage": round(voltage, 2),
-                    "current": round(current, 3),
-                    "power_factor": round(pf, 3),
-                    "real_power": round(real, 2),
-                    "apparent_power": round(apparent, 2),
-                    "reactive_power": round(reactive, 2)
+                    "voltage": round(v, 2),
+                    "current": round(c, 3),
+                    "power_factor": round(p, 3),
+                    "real_power": round(r, 2),
+                    "apparent_power": round(s, 2),
+                    "reactive_power": round(q, 2)
                 }
-                total_real += real
-                total_apparent += apparent
+            total_real = float(values[:, 3].sum())
+            total_apparent = float(values[:, 4].sum())
 
             overall_pf = total_real / total_apparent if total_apparent > 0 else 0
             total_reactive = math.sqrt(max(0, total_apparent**2 - total_real**2))
@@ -392,7 +853,7 @@ def simulate_data():
                     "total_apparent_power": round(total_apparent, 2),
                     "total_reactive_power": round(total_reactive, 2)}
 
-            req.post(f"http://127.0.0.1:{DEFAULT_PORT}/api/data", json=data, timeout=5)
+            session.post(url, json=data, timeout=5)
             t += 1
             time.sleep(2)
 
@@ -414,19 +875,23 @@ def main():
     parser.add_argument('--port', type=int, default=5000, help='Server port (default: 5000)')
     parser.add_argument('--threshold', type=float, default=0.85, help='PF threshold (default: 0.85)')
     parser.add_argument('--simulate', action='store_true', help='Run with simulated 3-phase data')
+    parser.add_argument('--production', action='store_true',
+                        help='Serve with gevent instead of the Flask development server')
     args = parser.parse_args()
 
     pf_threshold = args.threshold
     DEFAULT_PORT = args.port
 
-    init_excel()
+    init_log()
+    init_notifications()
 
     print("=" * 60)
     print("  ⚡ 3-PHASE POWER FACTOR MONITOR SERVER")
     print("=" * 60)
     print(f"  📡 Server:       http://0.0.0.0:{args.port}")
     print(f"  🎯 Threshold:    {pf_threshold}")
-    print(f"  📊 Excel:        {os.path.abspath(EXCEL_FILE)}")
+    print(f"  🗃  Log:          {os.path.abspath(log_path)}")
+    print(f"  📊 Excel:        http://localhost:{args.port}/api/export")
     print(f"  🌐 Dashboard:    http://localhost:{args.port}")
     print(f"  🔔 Notifications: {'Enabled' if NOTIFICATIONS_AVAILABLE else 'Disabled'}")
     print(f"  📐 Phases:       R, Y, B (3-phase)")
@@ -437,7 +902,17 @@ def main():
         sim_thread = threading.Thread(target=simulate_data, daemon=True)
         sim_thread.start()
 
-    app.run(host='0.0.0.0', port=args.port, debug=False, use_reloader=False)
+    if args.production:
+        from gevent.pywsgi import WSGIServer
+        print("🚀 Serving with gevent WSGIServer")
+        try:
+            WSGIServer(('0.0.0.0', args.port), app, log=None).serve_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Server stopped.")
+    else:
+        # The dev server speaks HTTP/1.0 by default, which closes every connection
+        WSGIRequestHandler.protocol_version = "HTTP/1.1"
+        app.run(host='0.0.0.0', port=args.port, debug=False, use_reloader=False)
 
 
 if __name__ == '__main__':
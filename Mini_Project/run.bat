@@ -13,6 +13,6 @@ echo.
 echo Starting server on http://localhost:5000
 echo Press Ctrl+C to stop.
 echo.
-python app.py --port 5000 --threshold 0.85
+python app.py --production --port 5000 --threshold 0.85
 
 pause
@@ -14,6 +14,6 @@ echo.
 echo Starting server with simulated data on http://localhost:5000
 echo Press Ctrl+C to stop.
 echo.
-python app.py --simulate --port 5000 --threshold 0.85
+python app.py --simulate --production --port 5000 --threshold 0.85
 
 pause
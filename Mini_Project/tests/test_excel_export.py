@@ -0,0 +1,42 @@
+"""Excel export splits across worksheets instead of dropping rows."""
+
+import zipfile
+
+import xlsxwriter
+
+import app
+
+
+def _reading(i):
+    data = {"timestamp": f"2026-01-01 00:00:{i:02d}", "overall_pf": 0.9,
+            "total_real_power": 1.0, "total_apparent_power": 1.0, "total_reactive_power": 0.0}
+    for key in app.PHASE_KEYS:
+        data[key] = {field: 0.9 for field in app.PHASE_FIELDS}
+    return data
+
+
+def _sheet_rows(path):
+    with zipfile.ZipFile(path) as zf:
+        sheets = sorted(n for n in zf.namelist() if n.startswith("xl/worksheets/sheet"))
+        return [zf.read(n).count(b"<row ") for n in sheets]
+
+
+def test_full_worksheet_continues_on_a_new_one(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "EXCEL_MAX_ROWS", 4)
+    monkeypatch.setattr(app, "iter_logged_readings", lambda since=None: map(_reading, range(7)))
+
+    path = tmp_path / "export.xlsx"
+    app.build_excel(str(path))
+
+    # Header plus 3 readings per sheet: 3 + 3 + 1 readings
+    assert _sheet_rows(path) == [4, 4, 2]
+
+
+def test_row_past_the_sheet_limit_is_reported(tmp_path):
+    wb = xlsxwriter.Workbook(str(tmp_path / "x.xlsx"))
+    ws = wb.add_worksheet()
+    formats = app.write_excel_header(wb, ws)
+
+    assert app.write_excel_row(ws, 1, _reading(1), formats)
+    assert not app.write_excel_row(ws, app.EXCEL_MAX_ROWS, _reading(2), formats)
+    wb.close()
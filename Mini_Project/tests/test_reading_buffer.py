@@ -0,0 +1,27 @@
+"""ReadingBuffer.recent(count) behaves like list[-count:] on the history."""
+
+import pytest
+
+import app
+
+CAPACITY = 5
+
+
+def _reading(i):
+    data = {"timestamp": f"t{i}", "overall_pf": i / 100,
+            "total_real_power": float(i), "total_apparent_power": 2.0 * i, "total_reactive_power": 3.0 * i}
+    for n, key in enumerate(app.PHASE_KEYS):
+        data[key] = {field: float(i * 10 + n + j / 10) for j, field in enumerate(app.PHASE_FIELDS)}
+    return data
+
+
+@pytest.mark.parametrize("filled", [3, CAPACITY, 2 * CAPACITY + 3])
+@pytest.mark.parametrize("count", [-2, 0, 1, CAPACITY, CAPACITY + 4])
+def test_recent_matches_list_slice(filled, count):
+    buffer = app.ReadingBuffer(CAPACITY)
+    history = [_reading(i) for i in range(filled)]
+    for data in history:
+        buffer.append(data)
+
+    assert buffer.recent(count) == history[-CAPACITY:][-count:]
+    assert buffer.latest() == history[-1]
@@ -0,0 +1,46 @@
+"""Reading log survives a killed run and damaged frames."""
+
+import orjson
+import pytest
+import zstandard
+
+import app
+
+
+def _frame(ids):
+    payload = b"".join(orjson.dumps({"id": i}) + b"\n" for i in ids)
+    return zstandard.ZstdCompressor(level=3).compress(payload)
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+    app.close_log()
+
+
+def test_restart_after_kill_mid_flush(log_dir):
+    # A run killed while its third batch was half-way onto disk
+    partial = _frame(range(20, 30))
+    (log_dir / "power_factor_log_20000101_000000_000000.jsonl.zst").write_bytes(
+        _frame(range(0, 10)) + _frame(range(10, 20)) + partial[:len(partial) // 2]
+    )
+
+    app.init_log()
+    for i in range(100, 105):
+        app.log_reading({"id": i})
+    app.close_log()
+
+    ids = [r["id"] for r in app.iter_logged_readings()]
+    assert ids[:20] == list(range(20))
+    assert ids[-5:] == list(range(100, 105))
+    assert ids[20:-5] == list(range(20, 20 + len(ids) - 25))
+    assert len(app.log_segments()) == 2
+
+
+def test_damaged_frame_is_skipped(log_dir):
+    (log_dir / "power_factor_log.jsonl.zst").write_bytes(
+        _frame([1, 2]) + b"\x00garbage\xff" * 8 + _frame([3, 4])
+    )
+
+    assert [r["id"] for r in app.iter_logged_readings()] == [1, 2, 3, 4]
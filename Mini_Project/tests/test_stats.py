@@ -0,0 +1,70 @@
+"""Running Stats match a brute-force scan of the readings window."""
+
+import random
+
+import pytest
+
+import app
+
+
+def _reading(rng, i):
+    data = {"timestamp": f"t{i}", "overall_pf": rng.choice([0, round(rng.uniform(0.3, 1), 3)]),
+            "total_real_power": 0.0, "total_apparent_power": 0.0, "total_reactive_power": 0.0}
+    for key in app.PHASE_KEYS:
+        pf = 0 if rng.random() < 0.2 else round(rng.uniform(0.3, 1), 3)
+        data[key] = {"voltage": round(rng.uniform(200, 240), 1),
+                     "current": round(rng.uniform(0, 5), 3),
+                     "power_factor": pf,
+                     "real_power": 0, "apparent_power": 0, "reactive_power": 0}
+    return data
+
+
+def _brute_force(window):
+    result = {"count": len(window), "threshold": app.pf_threshold, "phases": {}}
+    for name, key in zip(app.PHASE_NAMES, app.PHASE_KEYS):
+        pfs = [r[key]["power_factor"] for r in window if r[key]["power_factor"] > 0]
+        result["phases"][name] = {
+            "avg_pf": round(sum(pfs) / len(pfs), 3) if pfs else 0,
+            "min_pf": round(min(pfs), 3) if pfs else 0,
+            "max_pf": round(max(pfs), 3) if pfs else 0,
+            "avg_voltage": round(sum(r[key]["voltage"] for r in window) / len(window), 1),
+            "avg_current": round(sum(r[key]["current"] for r in window) / len(window), 3),
+            "low_pf_count": sum(pf < app.pf_threshold for pf in pfs),
+        }
+    pfs = [r["overall_pf"] for r in window if r["overall_pf"] > 0]
+    result["overall"] = {
+        "avg_pf": round(sum(pfs) / len(pfs), 3) if pfs else 0,
+        "min_pf": round(min(pfs), 3) if pfs else 0,
+        "max_pf": round(max(pfs), 3) if pfs else 0,
+    }
+    return result
+
+
+# Running sums may differ from a fresh sum in the last rounded digit;
+# min/max and counts must match exactly
+TOLERANCE = {"avg_pf": 1.5e-3, "avg_voltage": 0.15, "avg_current": 1.5e-3}
+
+
+def _assert_matches(got, expected):
+    assert got["count"] == expected["count"]
+    sections = [(got["phases"][n], e) for n, e in expected["phases"].items()]
+    sections.append((got["overall"], expected["overall"]))
+    for g, e in sections:
+        for field, value in e.items():
+            assert g[field] == pytest.approx(value, abs=TOLERANCE.get(field, 0)), field
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_stats_match_brute_force_past_capacity(seed):
+    rng = random.Random(seed)
+    capacity = 20
+    buffer = app.ReadingBuffer(capacity)
+    stats = app.Stats(capacity)
+    history = []
+
+    for i in range(3 * capacity + 7):
+        data = _reading(rng, i)
+        history.append(data)
+        row, evicted = buffer.append(data)
+        stats.add(row, evicted)
+        _assert_matches(stats.to_dict(), _brute_force(history[-capacity:]))
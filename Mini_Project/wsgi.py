@@ -1,11 +1,16 @@
 """
 WSGI entry point for production deployment.
 Used by Gunicorn, Render, Railway, etc.
+
+    gunicorn wsgi:app -k gevent -w 1 --worker-connections 1000
+
+Keep a single worker: readings, stats and the reading log live in-process.
 """
-from app import app, init_excel
+from app import app, init_log, init_notifications
 
-# Initialise the Excel file on startup
-init_excel()
+# Open the reading log and start notifications on startup
+init_log()
+init_notifications()
 
 if __name__ == '__main__':
     app.run()